@@ -0,0 +1,80 @@
+import json
+import random
+import time
+
+from main import Appointment, Clinic, Department, Doctor, Insurance, MedicalRecord, Patient
+
+
+def build_clinic(patient_count: int) -> Clinic:
+    clinic = Clinic()
+    doctors = [Doctor(f"Doctor {index}", 30 + index % 30, random.choice(["Cardiology", "Neurology"]))
+               for index in range(50)]
+    department = Department("General practice")
+    clinic.add_department(department)
+    for doctor in doctors:
+        clinic.add_doctor(doctor)
+        department.add_doctor(doctor)
+    for index in range(patient_count):
+        insurance = Insurance("Amica Mutual Insurance", f"HC{index:08d}")
+        patient = Patient(f"Patient {index}", random.randint(0, 90), insurance)
+        patient.add_medical_record(MedicalRecord("Hypertension", "Lifestyle changes"))
+        clinic.add_insurance(insurance)
+        clinic.add_patient(patient)
+        clinic.create_bill(patient.name, round(random.uniform(50, 1000), 2))
+        clinic.add_appointment(Appointment(patient, random.choice(doctors), "14-11-2024", "08:00 AM"))
+    return clinic
+
+
+def mutate(clinic: Clinic, change_count: int) -> None:
+    for _ in range(change_count):
+        patient = random.choice(clinic.patients)
+        action = random.randrange(8)
+        if action == 0:
+            clinic.update_bill(patient.name, round(random.uniform(50, 1000), 2))
+        elif action == 1:
+            patient.add_medical_record(MedicalRecord("Migraine", "Pain medications"))
+        elif action == 2:
+            clinic.add_appointment(Appointment(patient, random.choice(clinic.doctors), "28-12-2024", "11:00 AM"))
+        elif action == 3:
+            clinic.remove_patient(patient.name)
+            clinic.create_bill(clinic.patients[0].name, 10.0)
+        elif action == 4:
+            clinic.update_patient(patient.name, Patient(f"{patient.name} Jr.", 1, patient.insurance))
+        elif action == 5:
+            patient.insurance.provider = "CVS Health"
+        elif action == 6:
+            random.choice(clinic.doctors).age += 1
+        else:
+            patient.medical_records[0].treatment = "Beta blockers"
+
+
+def run(patient_count: int, change_count: int) -> None:
+    primary = build_clinic(patient_count)
+    replica = Clinic()
+    replica.apply_changes(json.loads(json.dumps(primary.changes_since(0))))
+
+    mutate(primary, change_count)
+
+    started = time.perf_counter()
+    snapshot = json.dumps(primary.to_dict())
+    snapshot_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    delta = json.dumps(primary.changes_since(replica.version))
+    replica.apply_changes(json.loads(delta))
+    delta_time = time.perf_counter() - started
+
+    assert replica.to_dict() == primary.to_dict()
+    fresh_replica = Clinic()
+    fresh_replica.apply_changes(json.loads(json.dumps(primary.changes_since(0))))
+    assert fresh_replica.to_dict() == primary.to_dict()
+    print(f"Пациентов: {patient_count}, изменений: {change_count}")
+    print(f"  полный снимок: {len(snapshot):>12} байт, {snapshot_time * 1000:8.1f} мс")
+    print(f"  дельта:        {len(delta):>12} байт, {delta_time * 1000:8.1f} мс")
+    print(f"  выигрыш по объему: {len(snapshot) / max(len(delta), 1):.1f}x")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for patients, changes in ((1000, 10), (5000, 50), (20000, 200)):
+        run(patients, changes)
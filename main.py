@@ -1,6 +1,20 @@
+import base64
+import bisect
+import contextlib
+import functools
 import json
+import math
+import multiprocessing
+import os
+import pickle
+import threading
+import weakref
 import xml.etree.ElementTree as ET
-from typing import List, Union
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 
 class CustomError(Exception):
@@ -8,7 +22,33 @@ class CustomError(Exception):
     pass
 
 
-class Person:
+_entity_owners: 'weakref.WeakKeyDictionary[Any, weakref.WeakKeyDictionary]' = weakref.WeakKeyDictionary()
+
+
+def _notify_change(entity: Any) -> None:
+    for clinic, collection in list(_entity_owners.get(entity, {}).items()):
+        clinic._item_changed(collection, entity)
+
+
+class _Tracked:
+    """Сообщает клиникам-владельцам об изменении публичных атрибутов объекта.
+
+    Владелец - клиника, в коллекции которой лежит объект, или клиника, чей элемент
+    встраивает объект в to_dict (тогда коллекция None).
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        owners = None if name.startswith('_') else _entity_owners.get(self)
+        if not owners:
+            object.__setattr__(self, name, value)
+            return
+        old_value = self.__dict__.get(name)
+        object.__setattr__(self, name, value)
+        for clinic, collection in list(owners.items()):
+            clinic._entity_changed(collection, self, name, old_value)
+
+
+class Person(_Tracked):
     def __init__(self, name: str, age: int) -> None:
         try:
             if not isinstance(name, str) or not name:
@@ -21,7 +61,7 @@ class Person:
             print(ex)
 
 
-class Insurance:
+class Insurance(_Tracked):
     def __init__(self, provider: str, policy_number: str) -> None:
         try:
             if not isinstance(provider, str) or not provider:
@@ -43,7 +83,7 @@ class Insurance:
         }
 
 
-class MedicalRecord:
+class MedicalRecord(_Tracked):
     def __init__(self, diagnosis: str, treatment: str) -> None:
         try:
             if not isinstance(diagnosis, str) or not diagnosis:
@@ -62,7 +102,7 @@ class MedicalRecord:
         }
 
 
-class Prescription:
+class Prescription(_Tracked):
     def __init__(self, medication: str) -> None:
         try:
             if not isinstance(medication, str) or not medication:
@@ -95,12 +135,14 @@ class Patient(Person):
 
     def add_medical_record(self, record: MedicalRecord) -> None:
         self.medical_records.append(record)
+        _notify_change(self)
 
     def update_medical_record(self, index: int, diagnosis: str, treatment: str) -> None:
         try:
             if 0 <= index < len(self.medical_records):
                 self.medical_records[index].diagnosis = diagnosis
                 self.medical_records[index].treatment = treatment
+                _notify_change(self)
             else:
                 raise CustomError("Ошибка: Индекс медицинской записи вне диапазона.")
         except CustomError as ex:
@@ -108,11 +150,13 @@ class Patient(Person):
 
     def add_prescription(self, prescription: Prescription) -> None:
         self.prescriptions.append(prescription)
+        _notify_change(self)
 
     def update_prescription(self, index: int, medication: str) -> None:
         try:
             if 0 <= index < len(self.prescriptions):
                 self.prescriptions[index].medication = medication
+                _notify_change(self)
             else:
                 raise CustomError("Ошибка: Индекс рецепта вне диапазона.")
         except CustomError as ex:
@@ -120,6 +164,7 @@ class Patient(Person):
 
     def add_treatment_plan(self, treatment_plan: 'TreatmentPlan') -> None:
         self.treatment_plans.append(treatment_plan)
+        _notify_change(self)
 
     def to_dict(self) -> dict:
         return {
@@ -164,7 +209,7 @@ class Staff(Person):
         }
 
 
-class Bill:
+class Bill(_Tracked):
     def __init__(self, patient: Patient, amount: float) -> None:
         self.patient = patient
         self.amount = amount
@@ -179,7 +224,7 @@ class Bill:
         }
 
 
-class Appointment:
+class Appointment(_Tracked):
     def __init__(self, patient: Patient, doctor: Doctor, date: str, time: str) -> None:
         self.patient = patient
         self.doctor = doctor
@@ -198,7 +243,7 @@ class Appointment:
         }
 
 
-class Department:
+class Department(_Tracked):
     def __init__(self, name: str) -> None:
         self.name = name
         self.doctors: List[Doctor] = []
@@ -208,6 +253,7 @@ class Department:
 
     def add_doctor(self, doctor: Doctor) -> None:
         self.doctors.append(doctor)
+        _notify_change(self)
 
     def to_dict(self) -> dict:
         return {
@@ -216,7 +262,7 @@ class Department:
         }
 
 
-class TreatmentPlan:
+class TreatmentPlan(_Tracked):
     def __init__(self, diagnosis: str, treatment_steps: List[str]) -> None:
         self.diagnosis = diagnosis
         self.treatment_steps = treatment_steps
@@ -228,7 +274,480 @@ class TreatmentPlan:
         }
 
 
+def _insurance_from_dict(data: dict) -> Insurance:
+    return Insurance(data['provider'], data['policy_number'])
+
+
+def _patient_from_dict(data: dict) -> Patient:
+    patient = Patient(data['name'], data['age'], _insurance_from_dict(data['insurance']))
+    for record in data['medical_records']:
+        patient.add_medical_record(MedicalRecord(record['diagnosis'], record['treatment']))
+    for prescription in data['prescriptions']:
+        patient.add_prescription(Prescription(prescription['medication']))
+    for treatment_plan in data['treatment_plans']:
+        patient.add_treatment_plan(TreatmentPlan(treatment_plan['diagnosis'], treatment_plan['treatment_steps']))
+    return patient
+
+
+def _doctor_from_dict(data: dict) -> Doctor:
+    return Doctor(data['name'], data['age'], data['specialty'])
+
+
+def _staff_from_dict(data: dict) -> Staff:
+    return Staff(data['name'], data['age'], data['position'])
+
+
+def _department_from_dict(data: dict) -> Department:
+    department = Department(data['name'])
+    for doctor in data['doctors']:
+        department.add_doctor(_doctor_from_dict(doctor))
+    return department
+
+
+_DATE_FORMATS = ('%d-%m-%Y', '%Y-%m-%d')
+
+
+def _date_key(date: str) -> Optional[Tuple[int, int, int]]:
+    for date_format in _DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(date, date_format)
+            return parsed.year, parsed.month, parsed.day
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+_INDEXED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'patients': ('age',),
+    'doctors': ('age',),
+    'staff': ('age',),
+    'bills': ('amount',),
+    'appointments': ('date',),
+}
+
+_KEY_FUNCTIONS: Dict[Tuple[str, str], Callable[[Any], Any]] = {
+    ('appointments', 'date'): _date_key,
+}
+
+_RELATIONS: Dict[Tuple[str, str], Tuple[str, str]] = {
+    ('patients', 'bills'): ('bills', 'patient'),
+    ('patients', 'appointments'): ('appointments', 'patient'),
+    ('doctors', 'appointments'): ('appointments', 'doctor'),
+}
+
+
+def _references(collection: str, item: Any) -> List[Any]:
+    """Объекты, которые элемент коллекции встраивает в свой to_dict."""
+    if collection == 'patients':
+        references = [getattr(item, 'insurance', None)]
+        for field in ('medical_records', 'prescriptions', 'treatment_plans'):
+            references.extend(getattr(item, field, ()))
+    elif collection == 'departments':
+        references = list(getattr(item, 'doctors', ()))
+    elif collection in ('bills', 'appointments'):
+        references = [getattr(item, 'patient', None), getattr(item, 'doctor', None)]
+    else:
+        references = []
+    return [reference for reference in references if isinstance(reference, _Tracked)]
+
+
+_NAMED_COLLECTIONS = ('patients', 'doctors')
+
+_LINKING_COLLECTIONS = ('bills', 'appointments')
+
+_REPLICATION_ORDER = ('insurances', 'patients', 'doctors', 'staff', 'departments', 'bills', 'appointments')
+
+_ENTITY_BUILDERS: Dict[str, Callable[[dict], Any]] = {
+    'insurances': _insurance_from_dict,
+    'patients': _patient_from_dict,
+    'doctors': _doctor_from_dict,
+    'staff': _staff_from_dict,
+    'departments': _department_from_dict,
+}
+
+
+def _field_key(collection: str, field: str, value: Any) -> Any:
+    key_function = _KEY_FUNCTIONS.get((collection, field))
+    if key_function is None or value is None:
+        return value
+    return key_function(value)
+
+
+def _orderable_key(key: Any) -> Any:
+    if isinstance(key, tuple):
+        return key
+    if isinstance(key, (int, float)) and not isinstance(key, bool) and key == key:
+        return key
+    return None
+
+
+def _index_key(collection: str, field: str, value: Any) -> Any:
+    return _orderable_key(_field_key(collection, field, value))
+
+
+def _check_page_size(page_size: Any) -> None:
+    if not isinstance(page_size, int) or isinstance(page_size, bool) or page_size <= 0:
+        raise CustomError("Ошибка: Размер страницы должен быть положительным целым числом.")
+
+
+def _encode_cursor(collection: str, sequence_number: int) -> str:
+    return base64.urlsafe_b64encode(f"{collection}:{sequence_number}".encode()).decode()
+
+
+def _decode_cursor(collection: str, cursor: str) -> int:
+    try:
+        cursor_collection, sequence_number = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        if cursor_collection != collection:
+            raise ValueError(cursor_collection)
+        return int(sequence_number)
+    except (AttributeError, TypeError, ValueError):
+        raise CustomError("Ошибка: Некорректный курсор страницы.")
+
+
+class SortedIndex:
+    """Вторичный индекс: пары (ключ, порядковый номер) хранятся отсортированными, поиск через bisect.
+
+    Порядковый номер делает каждую запись уникальной, поэтому удаление - один bisect
+    даже при множестве одинаковых ключей. Записи разбиты на блоки не длиннее
+    2 * _LOAD, так что вставка и удаление сдвигают только один блок.
+    Объекты с ключом None (значение нельзя упорядочить) всегда попадают в кандидаты
+    и проверяются фильтром запроса.
+    """
+
+    _LOAD = 512
+
+    def __init__(self) -> None:
+        self._keys: List[List[Tuple[Any, int]]] = []
+        self._items: List[List[Any]] = []
+        self._maxes: List[Tuple[Any, int]] = []
+        self._unordered: Dict[int, Any] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size + len(self._unordered)
+
+    def add(self, key: Any, sequence_number: int, item: Any) -> None:
+        if key is None:
+            self._unordered[sequence_number] = item
+            return
+        entry = (key, sequence_number)
+        if not self._keys:
+            self._keys.append([entry])
+            self._items.append([item])
+            self._maxes.append(entry)
+            self._size = 1
+            return
+        block = min(bisect.bisect_left(self._maxes, entry), len(self._keys) - 1)
+        keys, items = self._keys[block], self._items[block]
+        position = bisect.bisect_left(keys, entry)
+        keys.insert(position, entry)
+        items.insert(position, item)
+        self._maxes[block] = keys[-1]
+        self._size += 1
+        if len(keys) > 2 * self._LOAD:
+            self._keys[block:block + 1] = [keys[:self._LOAD], keys[self._LOAD:]]
+            self._items[block:block + 1] = [items[:self._LOAD], items[self._LOAD:]]
+            self._maxes[block:block + 1] = [keys[self._LOAD - 1], keys[-1]]
+
+    def remove(self, key: Any, sequence_number: int) -> bool:
+        if key is None:
+            return self._unordered.pop(sequence_number, None) is not None
+        entry = (key, sequence_number)
+        block = bisect.bisect_left(self._maxes, entry)
+        if block == len(self._keys):
+            return False
+        keys, items = self._keys[block], self._items[block]
+        position = bisect.bisect_left(keys, entry)
+        if position == len(keys) or keys[position] != entry:
+            return False
+        del keys[position]
+        del items[position]
+        self._size -= 1
+        if keys:
+            self._maxes[block] = keys[-1]
+        else:
+            del self._keys[block], self._items[block], self._maxes[block]
+        return True
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._items.clear()
+        self._maxes.clear()
+        self._unordered.clear()
+        self._size = 0
+
+    def _locate(self, bound: tuple, right: bool) -> Tuple[int, int]:
+        search = bisect.bisect_right if right else bisect.bisect_left
+        block = search(self._maxes, bound)
+        if block == len(self._keys):
+            return block, 0
+        return block, search(self._keys[block], bound)
+
+    def _bounds(self, low: Any, high: Any, include_low: bool,
+                include_high: bool) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        if low is None:
+            start = (0, 0)
+        elif include_low:
+            start = self._locate((low,), right=False)
+        else:
+            start = self._locate((low, math.inf), right=True)
+        if high is None:
+            end = (len(self._keys), 0)
+        elif include_high:
+            end = self._locate((high, math.inf), right=True)
+        else:
+            end = self._locate((high,), right=False)
+        return start, max(start, end)
+
+    def _offset(self, location: Tuple[int, int]) -> int:
+        block, position = location
+        return sum(len(keys) for keys in self._keys[:block]) + position
+
+    def count(self, low: Any = None, high: Any = None, include_low: bool = True, include_high: bool = True) -> int:
+        start, end = self._bounds(low, high, include_low, include_high)
+        return self._offset(end) - self._offset(start) + len(self._unordered)
+
+    def range(self, low: Any = None, high: Any = None, include_low: bool = True,
+              include_high: bool = True) -> List[Any]:
+        (start_block, start), (end_block, end) = self._bounds(low, high, include_low, include_high)
+        if start_block == end_block:
+            result = self._items[start_block][start:end] if start_block < len(self._items) else []
+        else:
+            result = self._items[start_block][start:]
+            for items in self._items[start_block + 1:end_block]:
+                result.extend(items)
+            if end_block < len(self._items):
+                result.extend(self._items[end_block][:end])
+        return result + list(self._unordered.values())
+
+
+class Query:
+    """Запрос к коллекции клиники: фильтры, связи, сортировка и ограничение числа строк."""
+
+    _OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'between', 'in')
+
+    def __init__(self, clinic: 'Clinic', collection: str) -> None:
+        if collection not in Clinic.COLLECTIONS:
+            raise CustomError(f"Ошибка: Неизвестная коллекция '{collection}'.")
+        self._clinic = clinic
+        self._collection = collection
+        self._conditions: List[Tuple[str, str, Any]] = []
+        self._joins: List[Tuple[str, 'Query']] = []
+        self._order: Optional[Tuple[str, bool]] = None
+        self._limit: Optional[int] = None
+
+    def where(self, field: str, operator: str, value: Any) -> 'Query':
+        if operator not in self._OPERATORS:
+            raise CustomError(f"Ошибка: Неизвестный оператор '{operator}'.")
+        if operator == 'between':
+            low, high = value
+            value = (self._key(field, low), self._key(field, high))
+        elif operator == 'in':
+            value = [self._key(field, option) for option in value]
+        else:
+            value = self._key(field, value)
+        self._conditions.append((field, operator, value))
+        return self
+
+    def join(self, relation: str, subquery: Optional['Query'] = None) -> 'Query':
+        target = _RELATIONS.get((self._collection, relation))
+        if target is None:
+            raise CustomError(f"Ошибка: Связь '{relation}' не определена для '{self._collection}'.")
+        target_collection, attribute = target
+        if subquery is None:
+            subquery = Query(self._clinic, target_collection)
+        elif subquery._collection != target_collection:
+            raise CustomError(f"Ошибка: Подзапрос для связи '{relation}' должен быть по '{target_collection}'.")
+        self._joins.append((attribute, subquery))
+        return self
+
+    def order_by(self, field: str, descending: bool = False) -> 'Query':
+        self._order = (field, descending)
+        return self
+
+    def limit(self, count: int) -> 'Query':
+        if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+            raise CustomError("Ошибка: Лимит должен быть неотрицательным целым числом.")
+        self._limit = count
+        return self
+
+    def all(self) -> List[Any]:
+        return self._execute()
+
+    def first(self) -> Any:
+        results = self._execute(limit=1)
+        return results[0] if results else None
+
+    def count(self) -> int:
+        return len(self._execute())
+
+    def to_dicts(self) -> List[dict]:
+        return [item.to_dict() for item in self._execute()]
+
+    def spec(self) -> tuple:
+        joins = [(attribute, subquery.spec()) for attribute, subquery in self._joins]
+        return self._collection, list(self._conditions), joins, self._order, self._limit
+
+    @classmethod
+    def from_spec(cls, clinic: 'Clinic', spec: tuple) -> 'Query':
+        collection, conditions, joins, order, limit = spec
+        query = cls(clinic, collection)
+        query._conditions = list(conditions)
+        query._joins = [(attribute, cls.from_spec(clinic, subquery)) for attribute, subquery in joins]
+        query._order = order
+        query._limit = limit
+        return query
+
+    def explain(self) -> str:
+        condition, estimate = self._plan()
+        if condition is None:
+            return f"scan {self._collection} ({estimate} rows)"
+        field, operator, _ = condition
+        return f"index {self._collection}.{field} {operator} ({estimate} rows)"
+
+    def _key(self, field: str, value: Any) -> Any:
+        key = _field_key(self._collection, field, value)
+        if key is None and value is not None:
+            raise CustomError(f"Ошибка: Некорректное значение '{value}' для поля '{field}'.")
+        return key
+
+    def _value(self, item: Any, field: str) -> Any:
+        value = item
+        for part in field.split('.'):
+            value = getattr(value, part, None)
+            if value is None:
+                return None
+        if '.' in field:
+            return value
+        return _field_key(self._collection, field, value)
+
+    @staticmethod
+    def _compare(actual: Any, operator: str, expected: Any) -> bool:
+        if actual is None:
+            return False
+        try:
+            if operator == '==':
+                return actual == expected
+            if operator == '!=':
+                return actual != expected
+            if operator == '<':
+                return actual < expected
+            if operator == '<=':
+                return actual <= expected
+            if operator == '>':
+                return actual > expected
+            if operator == '>=':
+                return actual >= expected
+            if operator == 'between':
+                return expected[0] <= actual <= expected[1]
+            return actual in expected
+        except TypeError:
+            return False
+
+    @staticmethod
+    def _range(operator: str, value: Any) -> Tuple[Any, Any, bool, bool]:
+        if operator == '==':
+            return value, value, True, True
+        if operator == '<':
+            return None, value, True, False
+        if operator == '<=':
+            return None, value, True, True
+        if operator == '>':
+            return value, None, False, True
+        if operator == '>=':
+            return value, None, True, True
+        return value[0], value[1], True, True
+
+    def _plan(self) -> Tuple[Optional[Tuple[str, str, Any]], int]:
+        best_condition = None
+        best_estimate = len(self._clinic._sequence_list(self._collection))
+        for condition in self._conditions:
+            field, operator, value = condition
+            if field not in _INDEXED_FIELDS.get(self._collection, ()) or operator in ('!=', 'in'):
+                continue
+            index = self._clinic._indexes[(self._collection, field)]
+            try:
+                estimate = index.count(*self._range(operator, value))
+            except TypeError:
+                continue
+            if estimate < best_estimate:
+                best_condition, best_estimate = condition, estimate
+        return best_condition, best_estimate
+
+    def _execute(self, limit: Optional[int] = None) -> List[Any]:
+        condition, _ = self._plan()
+        if condition is None:
+            candidates = list(getattr(self._clinic, self._collection))
+        else:
+            field, operator, value = condition
+            index = self._clinic._indexes[(self._collection, field)]
+            candidates = index.range(*self._range(operator, value))
+
+        related = [{id(getattr(item, attribute, None)) for item in subquery._execute()}
+                   for attribute, subquery in self._joins]
+        related.sort(key=len)
+
+        if limit is None or (self._limit is not None and self._limit < limit):
+            limit = self._limit
+        stop_early = limit is not None and self._order is None
+
+        results = []
+        for item in candidates:
+            if not all(self._compare(self._value(item, field), operator, value)
+                       for field, operator, value in self._conditions):
+                continue
+            if not all(id(item) in ids for ids in related):
+                continue
+            results.append(item)
+            if stop_early and len(results) >= limit:
+                break
+
+        results = self._sorted(results)
+        if limit is not None:
+            results = results[:limit]
+        return results
+
+    def _sorted(self, results: List[Any]) -> List[Any]:
+        if self._order is None:
+            return results
+        field, descending = self._order
+        present, missing = [], []
+        for item in results:
+            key = self._order_key(field, self._value(item, field))
+            if key is None:
+                missing.append(item)
+            else:
+                present.append((key, item))
+        present.sort(key=lambda pair: pair[0], reverse=descending)
+        return [item for _, item in present] + missing
+
+    def _order_key(self, field: str, value: Any) -> Any:
+        if isinstance(value, str) and field not in _INDEXED_FIELDS.get(self._collection, ()):
+            return 2, value
+        key = _orderable_key(value)
+        if key is None:
+            return None
+        return (1 if isinstance(key, tuple) else 0), key
+
+
+def _synchronized(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Clinic:
+    """Клиника: списки patients, doctors и т.д. открыты для чтения.
+
+    Добавлять, заменять и удалять элементы нужно методами Clinic: прямые правки списков
+    (append, pop, присваивание по индексу) обходят индексы и журнал изменений.
+    Если длина списка разошлась с учетом клиники, запросы и итераторы сообщают об ошибке.
+    """
+
+    COLLECTIONS = ('patients', 'doctors', 'staff', 'appointments', 'departments', 'bills', 'insurances')
+
     def __init__(self) -> None:
         self.patients: List[Patient] = []
         self.doctors: List[Doctor] = []
@@ -237,6 +756,314 @@ class Clinic:
         self.departments: List[Department] = []
         self.bills: List[Bill] = []
         self.insurances: List[Insurance] = []
+        self._next_seq = 0
+        self._sequence_numbers: Dict[str, List[int]] = {collection: [] for collection in self.COLLECTIONS}
+        self.version = 0
+        self._changes: 'OrderedDict[Tuple[str, int], Tuple[int, Any]]' = OrderedDict()
+        self._tombstones: 'OrderedDict[Tuple[str, int], int]' = OrderedDict()
+        self._compacted_version = 0
+        self._init_lookups()
+
+    def _init_lookups(self) -> None:
+        self._indexes: Dict[Tuple[str, str], SortedIndex] = {
+            (collection, field): SortedIndex()
+            for collection, fields in _INDEXED_FIELDS.items()
+            for field in fields
+        }
+        self._item_sequence_numbers: Dict[int, List[int]] = {}
+        self._names: Dict[str, Dict[str, Dict[int, Any]]] = {collection: {} for collection in _NAMED_COLLECTIONS}
+        self._references: Dict[Tuple[str, int], List[Any]] = {}
+        self._referrers: Dict[int, Dict[Tuple[str, int], Any]] = {}
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for name in ('_indexes', '_item_sequence_numbers', '_names', '_references', '_referrers', '_lock'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Индексы и служебные словари по id() строятся заново для восстановленных объектов."""
+        self.__dict__.update(state)
+        self._init_lookups()
+        for collection in self.COLLECTIONS:
+            for item, sequence_number in zip(getattr(self, collection), self._sequence_numbers[collection]):
+                self._register(collection, sequence_number, item)
+
+    def snapshot(self) -> 'Clinic':
+        with self._lock:
+            data = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        return pickle.loads(data)
+
+    def query(self, collection: str) -> Query:
+        return Query(self, collection)
+
+    def _run_query(self, spec: tuple, terminal: str, limit: Optional[int] = None) -> Any:
+        query = Query.from_spec(self, spec)
+        if terminal == 'all':
+            return query._execute(limit)
+        return getattr(query, terminal)()
+
+    @_synchronized
+    def reindex(self) -> None:
+        for index in self._indexes.values():
+            index.clear()
+        for collection in _INDEXED_FIELDS:
+            for item, sequence_number in zip(getattr(self, collection), self._sequence_list(collection)):
+                self._index_item(collection, sequence_number, item)
+
+    def _index_item(self, collection: str, sequence_number: int, item: Any) -> None:
+        for field in _INDEXED_FIELDS.get(collection, ()):
+            key = _index_key(collection, field, getattr(item, field, None))
+            self._indexes[(collection, field)].add(key, sequence_number, item)
+
+    def _unindex_item(self, collection: str, sequence_number: int, item: Any) -> None:
+        for field in _INDEXED_FIELDS.get(collection, ()):
+            key = _index_key(collection, field, getattr(item, field, None))
+            self._indexes[(collection, field)].remove(key, sequence_number)
+
+    @_synchronized
+    def _entity_changed(self, collection: Optional[str], item: Any, field: str, old_value: Any) -> None:
+        sequence_numbers = self._item_sequence_numbers.get(id(item), ()) if collection is not None else ()
+        if field in _INDEXED_FIELDS.get(collection, ()):
+            index = self._indexes[(collection, field)]
+            old_key = _index_key(collection, field, old_value)
+            new_key = _index_key(collection, field, getattr(item, field, None))
+            for sequence_number in sequence_numbers:
+                index.remove(old_key, sequence_number)
+                index.add(new_key, sequence_number, item)
+        if field == 'name' and collection in _NAMED_COLLECTIONS:
+            for sequence_number in sequence_numbers:
+                self._unname(collection, sequence_number, old_value)
+                self._names[collection].setdefault(item.name, {})[sequence_number] = item
+        self._item_changed(collection, item)
+
+    @_synchronized
+    def _item_changed(self, collection: Optional[str], item: Any) -> None:
+        if collection is not None:
+            for sequence_number in self._item_sequence_numbers.get(id(item), ()):
+                self._unlink_references(collection, sequence_number)
+                self._link_references(collection, sequence_number, item)
+                self._record_change(collection, sequence_number, item)
+        member = id(item) in self._item_sequence_numbers
+        for (referrer_collection, sequence_number), referrer in list(self._referrers.get(id(item), {}).items()):
+            if referrer_collection not in _LINKING_COLLECTIONS or not member:
+                self._record_change(referrer_collection, sequence_number, referrer)
+
+    def _sequence_list(self, collection: str) -> List[int]:
+        sequence_numbers = self._sequence_numbers[collection]
+        if len(sequence_numbers) != len(getattr(self, collection)):
+            raise CustomError(f"Ошибка: Коллекция '{collection}' изменена в обход методов Clinic.")
+        return sequence_numbers
+
+    def _first_named(self, collection: str, name: str) -> Any:
+        named = self._names[collection].get(name)
+        return named[min(named)] if named else None
+
+    def _unname(self, collection: str, sequence_number: int, name: Any) -> None:
+        named = self._names[collection].get(name, {})
+        named.pop(sequence_number, None)
+        if not named:
+            self._names[collection].pop(name, None)
+
+    def _link_references(self, collection: str, sequence_number: int, item: Any) -> None:
+        key = (collection, sequence_number)
+        references = _references(collection, item)
+        self._references[key] = references
+        for reference in references:
+            self._referrers.setdefault(id(reference), {})[key] = item
+            _entity_owners.setdefault(reference, weakref.WeakKeyDictionary()).setdefault(self, None)
+
+    def _unlink_references(self, collection: str, sequence_number: int) -> None:
+        key = (collection, sequence_number)
+        for reference in self._references.pop(key, ()):
+            referrers = self._referrers.get(id(reference), {})
+            referrers.pop(key, None)
+            if not referrers:
+                self._referrers.pop(id(reference), None)
+                self._release(reference)
+
+    def _release(self, entity: Any) -> None:
+        if id(entity) in self._item_sequence_numbers or id(entity) in self._referrers:
+            return
+        if entity in _entity_owners:
+            _entity_owners[entity].pop(self, None)
+
+    def _track(self, collection: str, sequence_number: int, item: Any, version: Optional[int] = None) -> None:
+        self._register(collection, sequence_number, item)
+        self._record_change(collection, sequence_number, item, version=version)
+
+    def _register(self, collection: str, sequence_number: int, item: Any) -> None:
+        self._item_sequence_numbers.setdefault(id(item), []).append(sequence_number)
+        _entity_owners.setdefault(item, weakref.WeakKeyDictionary())[self] = collection
+        if collection in _NAMED_COLLECTIONS:
+            self._names[collection].setdefault(getattr(item, 'name', None), {})[sequence_number] = item
+        self._link_references(collection, sequence_number, item)
+        self._index_item(collection, sequence_number, item)
+
+    def _untrack(self, collection: str, sequence_number: int, item: Any, version: Optional[int] = None) -> None:
+        self._unindex_item(collection, sequence_number, item)
+        self._unlink_references(collection, sequence_number)
+        if collection in _NAMED_COLLECTIONS:
+            self._unname(collection, sequence_number, getattr(item, 'name', None))
+        item_sequence_numbers = self._item_sequence_numbers.get(id(item), [])
+        if sequence_number in item_sequence_numbers:
+            item_sequence_numbers.remove(sequence_number)
+        if not item_sequence_numbers:
+            self._item_sequence_numbers.pop(id(item), None)
+            if id(item) in self._referrers:
+                _entity_owners[item][self] = None
+                for key, referrer in list(self._referrers[id(item)].items()):
+                    if key[0] in _LINKING_COLLECTIONS:
+                        self._record_change(*key, referrer, version=version)
+            else:
+                self._release(item)
+        self._record_change(collection, sequence_number, None, version=version)
+
+    def _append(self, collection: str, item: Any) -> None:
+        self._insert(collection, len(getattr(self, collection)), item, self._next_seq)
+
+    def _insert(self, collection: str, position: int, item: Any, sequence_number: int,
+                version: Optional[int] = None) -> None:
+        getattr(self, collection).insert(position, item)
+        self._sequence_numbers[collection].insert(position, sequence_number)
+        self._next_seq = max(self._next_seq, sequence_number + 1)
+        self._track(collection, sequence_number, item, version)
+
+    def _replace(self, collection: str, position: int, item: Any, version: Optional[int] = None) -> None:
+        items = getattr(self, collection)
+        sequence_number = self._sequence_numbers[collection][position]
+        self._untrack(collection, sequence_number, items[position], version)
+        items[position] = item
+        self._track(collection, sequence_number, item, version)
+
+    def _delete(self, collection: str, position: int, version: Optional[int] = None) -> None:
+        item = getattr(self, collection).pop(position)
+        sequence_number = self._sequence_numbers[collection].pop(position)
+        self._untrack(collection, sequence_number, item, version)
+
+    @_synchronized
+    def _record_change(self, collection: str, sequence_number: int, item: Any,
+                       version: Optional[int] = None) -> None:
+        self.version = self.version + 1 if version is None else max(self.version, version)
+        key = (collection, sequence_number)
+        self._changes[key] = (self.version, item)
+        self._changes.move_to_end(key)
+        if item is None:
+            self._tombstones[key] = self.version
+            self._tombstones.move_to_end(key)
+        else:
+            self._tombstones.pop(key, None)
+
+    @_synchronized
+    def changes_since(self, version: int) -> dict:
+        changes = []
+        reset = version < self._compacted_version
+        if reset:
+            for (collection, sequence_number), (_, item) in self._changes.items():
+                if item is not None:
+                    changes.append(self._change_entry(collection, sequence_number, item))
+        else:
+            for (collection, sequence_number), (changed_in, item) in reversed(self._changes.items()):
+                if changed_in <= version:
+                    break
+                changes.append(self._change_entry(collection, sequence_number, item))
+            changes.reverse()
+        return {
+            'version': self.version,
+            'reset': reset,
+            'changes': changes
+        }
+
+    @_synchronized
+    def compact_changes(self, version: int) -> None:
+        version = min(version, self.version)
+        while self._tombstones:
+            key, changed_in = next(iter(self._tombstones.items()))
+            if changed_in > version:
+                break
+            del self._tombstones[key]
+            del self._changes[key]
+        self._compacted_version = max(self._compacted_version, version)
+
+    def _change_entry(self, collection: str, sequence_number: int, item: Any) -> dict:
+        data = None
+        if item is not None:
+            data = item.to_dict()
+            for field in ('patient', 'doctor'):
+                reference = getattr(item, field, None) if collection in ('bills', 'appointments') else None
+                if reference is not None and id(reference) not in self._item_sequence_numbers:
+                    data[f'{field}_data'] = reference.to_dict()
+        return {
+            'collection': collection,
+            'id': sequence_number,
+            'data': data
+        }
+
+    def _resolve_reference(self, data: dict, field: str) -> Any:
+        if f'{field}_data' in data:
+            return _ENTITY_BUILDERS[f'{field}s'](data[f'{field}_data'])
+        reference = self._first_named(f'{field}s', data[field])
+        if reference is None:
+            raise CustomError(f"Ошибка: Не найден объект '{data[field]}' для репликации.")
+        return reference
+
+    def _clear(self) -> None:
+        for collection in self.COLLECTIONS:
+            for position in reversed(range(len(getattr(self, collection)))):
+                self._delete(collection, position, version=self.version)
+        self._changes.clear()
+        self._tombstones.clear()
+
+    def _relink_referrers(self, old: Any, new: Any, version: int) -> None:
+        for (collection, sequence_number), referrer in list(self._referrers.get(id(old), {}).items()):
+            if collection not in _LINKING_COLLECTIONS:
+                continue
+            for field in ('patient', 'doctor'):
+                if getattr(referrer, field, None) is old:
+                    object.__setattr__(referrer, field, new)
+            self._unlink_references(collection, sequence_number)
+            self._link_references(collection, sequence_number, referrer)
+            self._record_change(collection, sequence_number, referrer, version=version)
+
+    @_synchronized
+    def apply_changes(self, delta: dict) -> None:
+        version = delta['version']
+        changes = sorted(delta['changes'], key=lambda change: (_REPLICATION_ORDER.index(change['collection']),
+                                                               change['id']))
+        if delta.get('reset'):
+            self._clear()
+            self._compacted_version = version
+        for change in changes:
+            collection, sequence_number, data = change['collection'], change['id'], change['data']
+            items = getattr(self, collection)
+            sequence_numbers = self._sequence_list(collection)
+            position = bisect.bisect_left(sequence_numbers, sequence_number)
+            existing = None
+            if position < len(items) and sequence_numbers[position] == sequence_number:
+                existing = items[position]
+
+            if data is None:
+                if existing is not None:
+                    self._delete(collection, position, version=version)
+                continue
+
+            if collection in ('bills', 'appointments'):
+                patient = self._resolve_reference(data, 'patient')
+                if collection == 'bills':
+                    item = Bill(patient, data['amount'])
+                else:
+                    doctor = self._resolve_reference(data, 'doctor')
+                    item = Appointment(patient, doctor, data['date'], data['time'])
+            else:
+                item = _ENTITY_BUILDERS[collection](data)
+
+            if existing is not None:
+                self._replace(collection, position, item, version=version)
+                self._relink_referrers(existing, item, version)
+            else:
+                self._insert(collection, position, item, sequence_number, version=version)
+        self.version = max(self.version, version)
 
     def get_patients(self) -> List[dict]:
         return [patient.to_dict() for patient in self.patients]
@@ -259,8 +1086,96 @@ class Clinic:
     def get_insurances(self) -> List[dict]:
         return [insurance.to_dict() for insurance in self.insurances]
 
+    def iter_patients(self, predicate: Optional[Callable[[Patient], bool]] = None) -> Iterator[dict]:
+        return self._iter_dicts('patients', predicate)
+
+    def iter_doctors(self, predicate: Optional[Callable[[Doctor], bool]] = None) -> Iterator[dict]:
+        return self._iter_dicts('doctors', predicate)
+
+    def iter_staffs(self, predicate: Optional[Callable[[Staff], bool]] = None) -> Iterator[dict]:
+        return self._iter_dicts('staff', predicate)
+
+    def iter_appointments(self, predicate: Optional[Callable[[Appointment], bool]] = None) -> Iterator[dict]:
+        return self._iter_dicts('appointments', predicate)
+
+    def iter_departments(self, predicate: Optional[Callable[[Department], bool]] = None) -> Iterator[dict]:
+        return self._iter_dicts('departments', predicate)
+
+    def iter_bills(self, predicate: Optional[Callable[[Bill], bool]] = None) -> Iterator[dict]:
+        return self._iter_dicts('bills', predicate)
+
+    def iter_insurances(self, predicate: Optional[Callable[[Insurance], bool]] = None) -> Iterator[dict]:
+        return self._iter_dicts('insurances', predicate)
+
+    def get_patients_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                          predicate: Optional[Callable[[Patient], bool]] = None) -> dict:
+        return self._get_page('patients', cursor, page_size, predicate)
+
+    def get_doctors_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                         predicate: Optional[Callable[[Doctor], bool]] = None) -> dict:
+        return self._get_page('doctors', cursor, page_size, predicate)
+
+    def get_staffs_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                        predicate: Optional[Callable[[Staff], bool]] = None) -> dict:
+        return self._get_page('staff', cursor, page_size, predicate)
+
+    def get_appointments_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                              predicate: Optional[Callable[[Appointment], bool]] = None) -> dict:
+        return self._get_page('appointments', cursor, page_size, predicate)
+
+    def get_departments_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                             predicate: Optional[Callable[[Department], bool]] = None) -> dict:
+        return self._get_page('departments', cursor, page_size, predicate)
+
+    def get_bills_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                       predicate: Optional[Callable[[Bill], bool]] = None) -> dict:
+        return self._get_page('bills', cursor, page_size, predicate)
+
+    def get_insurances_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                            predicate: Optional[Callable[[Insurance], bool]] = None) -> dict:
+        return self._get_page('insurances', cursor, page_size, predicate)
+
+    def _iter_items(self, collection: str, predicate: Optional[Callable[[Any], bool]] = None,
+                    after: int = -1) -> Iterator[Any]:
+        items = getattr(self, collection)
+        while True:
+            sequence_numbers = self._sequence_list(collection)
+            position = bisect.bisect_right(sequence_numbers, after)
+            if position >= len(items):
+                return
+            item = items[position]
+            after = sequence_numbers[position]
+            if predicate is None or predicate(item):
+                yield item, after
+
+    def _iter_dicts(self, collection: str, predicate: Optional[Callable[[Any], bool]] = None) -> Iterator[dict]:
+        try:
+            for item, _ in self._iter_items(collection, predicate):
+                yield item.to_dict()
+        except CustomError as ex:
+            print(ex)
+
+    def _get_page(self, collection: str, cursor: Optional[str], page_size: int,
+                  predicate: Optional[Callable[[Any], bool]]) -> dict:
+        try:
+            _check_page_size(page_size)
+            after = -1 if cursor is None else _decode_cursor(collection, cursor)
+            page = list(islice(self._iter_items(collection, predicate, after), page_size))
+            next_cursor = None
+            if len(page) == page_size:
+                last = page[-1][1]
+                if bisect.bisect_right(self._sequence_list(collection), last) < len(getattr(self, collection)):
+                    next_cursor = _encode_cursor(collection, last)
+            return {
+                'items': [item.to_dict() for item, _ in page],
+                'next_cursor': next_cursor
+            }
+        except CustomError as ex:
+            print(ex)
+
+    @_synchronized
     def add_patient(self, patient: Patient) -> None:
-        self.patients.append(patient)
+        self._append('patients', patient)
 
     def get_patient(self, name: str) -> Patient:
         try:
@@ -271,21 +1186,24 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def update_patient(self, name: str, updated_patient: Patient) -> None:
         try:
             for index, patient in enumerate(self.patients):
                 if patient.name == name:
-                    self.patients[index] = updated_patient
+                    self._replace('patients', index, updated_patient)
                     return
             raise CustomError("Ошибка: Пациент не найден.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def remove_patient(self, patient_name: str) -> None:
-        self._remove_item(self.patients, patient_name)
+        self._remove_item('patients', patient_name)
 
+    @_synchronized
     def add_insurance(self, insurance: Insurance) -> None:
-        self.insurances.append(insurance)
+        self._append('insurances', insurance)
 
     def get_insurance(self, policy_number: str) -> Insurance:
         try:
@@ -296,28 +1214,31 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def update_insurance(self, policy_number: str, updated_insurance: Insurance) -> None:
         try:
             for index, insurance in enumerate(self.insurances):
                 if insurance.policy_number == policy_number:
-                    self.insurances[index] = updated_insurance
+                    self._replace('insurances', index, updated_insurance)
                     return
             raise CustomError("Ошибка: Страховка не найдена.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def remove_insurance(self, policy_number: str) -> None:
         try:
             for index, insurance in enumerate(self.insurances):
                 if insurance.policy_number == policy_number:
-                    del self.insurances[index]
+                    self._delete('insurances', index)
                     return
             raise CustomError("Ошибка: Страховка не найдена.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def add_doctor(self, doctor: Doctor) -> None:
-        self.doctors.append(doctor)
+        self._append('doctors', doctor)
 
     def get_doctor(self, name: str) -> Doctor:
         try:
@@ -328,21 +1249,24 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def update_doctor(self, name: str, updated_doctor: Doctor) -> None:
         try:
             for index, doctor in enumerate(self.doctors):
                 if doctor.name == name:
-                    self.doctors[index] = updated_doctor
+                    self._replace('doctors', index, updated_doctor)
                     return
             raise CustomError("Ошибка: Врач не найден.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def remove_doctor(self, doctor_name: str) -> None:
-        self._remove_item(self.doctors, doctor_name)
+        self._remove_item('doctors', doctor_name)
 
+    @_synchronized
     def add_staff(self, staff_member: Staff) -> None:
-        self.staff.append(staff_member)
+        self._append('staff', staff_member)
 
     def get_staff(self, name: str) -> Staff:
         try:
@@ -353,21 +1277,24 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def update_staff(self, name: str, updated_staff: Staff) -> None:
         try:
             for index, staff_member in enumerate(self.staff):
                 if staff_member.name == name:
-                    self.staff[index] = updated_staff
+                    self._replace('staff', index, updated_staff)
                     return
             raise CustomError("Ошибка: Сотрудник не найден.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def remove_staff(self, staff_name: str) -> None:
-        self._remove_item(self.staff, staff_name)
+        self._remove_item('staff', staff_name)
 
+    @_synchronized
     def add_appointment(self, appointment: Appointment) -> None:
-        self.appointments.append(appointment)
+        self._append('appointments', appointment)
 
     def get_appointment(self, patient_name: str, doctor_name: str) -> Appointment:
         try:
@@ -378,28 +1305,31 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def update_appointment(self, patient_name: str, doctor_name: str, updated_appointment: Appointment) -> None:
         try:
             for index, appointment in enumerate(self.appointments):
                 if appointment.patient.name == patient_name and appointment.doctor.name == doctor_name:
-                    self.appointments[index] = updated_appointment
+                    self._replace('appointments', index, updated_appointment)
                     return
             raise CustomError("Ошибка: Назначение не найдено.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def remove_appointment(self, patient_name: str, doctor_name: str) -> None:
         try:
             for index, appointment in enumerate(self.appointments):
                 if appointment.patient.name == patient_name and appointment.doctor.name == doctor_name:
-                    del self.appointments[index]
+                    self._delete('appointments', index)
                     return
             raise CustomError("Ошибка: Назначение не найдено.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def add_department(self, department: Department) -> None:
-        self.departments.append(department)
+        self._append('departments', department)
 
     def get_department(self, name: str) -> Department:
         try:
@@ -410,31 +1340,70 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def update_department(self, name: str, updated_department: Department) -> None:
         try:
             for index, department in enumerate(self.departments):
                 if department.name == name:
-                    self.departments[index] = updated_department
+                    self._replace('departments', index, updated_department)
                     return
             raise CustomError("Ошибка: Отдел не найден.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def remove_department(self, department_name: str) -> None:
         try:
             for index, department in enumerate(self.departments):
                 if department.name == department_name:
-                    del self.departments[index]
+                    self._delete('departments', index)
                     return
             raise CustomError("Ошибка: Отдел не найден.")
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
+    def add_department_doctor(self, department_name: str, doctor: Doctor) -> None:
+        department = self.get_department(department_name)
+        if department:
+            department.add_doctor(doctor)
+
+    @_synchronized
+    def add_medical_record(self, patient_name: str, record: MedicalRecord) -> None:
+        patient = self.get_patient(patient_name)
+        if patient:
+            patient.add_medical_record(record)
+
+    @_synchronized
+    def update_medical_record(self, patient_name: str, index: int, diagnosis: str, treatment: str) -> None:
+        patient = self.get_patient(patient_name)
+        if patient:
+            patient.update_medical_record(index, diagnosis, treatment)
+
+    @_synchronized
+    def add_prescription(self, patient_name: str, prescription: Prescription) -> None:
+        patient = self.get_patient(patient_name)
+        if patient:
+            patient.add_prescription(prescription)
+
+    @_synchronized
+    def update_prescription(self, patient_name: str, index: int, medication: str) -> None:
+        patient = self.get_patient(patient_name)
+        if patient:
+            patient.update_prescription(index, medication)
+
+    @_synchronized
+    def add_treatment_plan(self, patient_name: str, treatment_plan: TreatmentPlan) -> None:
+        patient = self.get_patient(patient_name)
+        if patient:
+            patient.add_treatment_plan(treatment_plan)
+
+    @_synchronized
     def create_bill(self, patient_name: str, amount: float) -> None:
         patient = self.get_patient(patient_name)
         if patient:
             bill = Bill(patient, amount)
-            self.bills.append(bill)
+            self._append('bills', bill)
 
     def get_bill(self, patient_name: str) -> Bill:
         try:
@@ -445,6 +1414,7 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def update_bill(self, patient_name: str, new_amount: float) -> None:
         try:
             for bill in self.bills:
@@ -455,14 +1425,15 @@ class Clinic:
         except CustomError as ex:
             print(ex)
 
+    @_synchronized
     def remove_bill(self, patient_name: str) -> None:
-        self._remove_item(self.bills, patient_name, is_bill=True)
+        self._remove_item('bills', patient_name, is_bill=True)
 
-    def _remove_item(self, item_list: List[Union[Patient, Doctor, Staff, Bill]], name: str,
-                     is_bill: bool = False) -> bool:
-        for item in item_list:
+    def _remove_item(self, collection: str, name: str, is_bill: bool = False) -> bool:
+        item_list: List[Union[Patient, Doctor, Staff, Bill]] = getattr(self, collection)
+        for index, item in enumerate(item_list):
             if (is_bill and item.patient.name == name) or (not is_bill and item.name == name):
-                item_list.remove(item)
+                self._delete(collection, index)
                 return True
         print("Ошибка: Не найдено.")
         return False
@@ -479,44 +1450,162 @@ class Clinic:
         }
 
 
+@contextlib.contextmanager
+def _atomic_write(filename: str, mode: str = 'w') -> Iterator[Any]:
+    """Пишет во временный файл рядом с filename и подменяет его через os.replace."""
+    temp_name = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_name, mode) as file:
+            yield file
+        os.replace(temp_name, filename)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+class BackgroundSave:
+    """Сохранение снимка клиники, выполняемое в дочернем процессе или отдельном потоке.
+
+    wait() возвращает True, если файл записан, иначе False; текст ошибки доступен в error.
+    Дочерние процессы, для которых не вызвали wait(), забираются при следующем
+    save_in_background или done().
+    """
+
+    def __init__(self, pid: Optional[int] = None, read_fd: Optional[int] = None,
+                 target: Optional[Callable[[], None]] = None) -> None:
+        self.error: Optional[str] = None
+        self._pid = pid
+        self._read_fd = read_fd
+        self._reap_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if target is not None:
+            self._thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+            self._thread.start()
+
+    def _run(self, target: Callable[[], None]) -> None:
+        try:
+            target()
+        except Exception as ex:
+            self.error = str(ex) or type(ex).__name__
+
+    def done(self) -> bool:
+        if self._thread is not None:
+            return not self._thread.is_alive()
+        return self._reap(os.WNOHANG)
+
+    def wait(self) -> bool:
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self._reap(0)
+        return self.error is None
+
+    def _reap(self, options: int) -> bool:
+        with self._reap_lock:
+            if self._pid is None:
+                return True
+            pid, status = os.waitpid(self._pid, options)
+            if pid == 0:
+                return False
+            with os.fdopen(self._read_fd, 'rb') as pipe:
+                message = pipe.read().decode(errors='replace')
+            exit_code = os.waitstatus_to_exitcode(status)
+            if exit_code != 0:
+                self.error = message or f"дочерний процесс завершился с кодом {exit_code}"
+            self._pid = None
+            return True
+
+
+_forked_saves: List[BackgroundSave] = []
+_forked_saves_lock = threading.Lock()
+
+
+def _reap_forked_saves() -> None:
+    with _forked_saves_lock:
+        _forked_saves[:] = [handle for handle in _forked_saves if not handle.done()]
+
+
 class DataStorage:
+    EXTENSION: Optional[str] = None
+
     def save(self, clinic: Clinic, filename: str) -> None:
         raise NotImplementedError
 
     def load(self, filename: str) -> Clinic:
         raise NotImplementedError
 
+    def _write(self, clinic: Clinic, filename: str) -> None:
+        raise NotImplementedError
+
+    def save_in_background(self, clinic: Clinic, filename: str) -> BackgroundSave:
+        """Сохраняет клинику в фоне; результат - через BackgroundSave.wait().
+
+        os.fork используется, только если в процессе один поток (например, процесс шарда
+        или однопоточный скрипт): fork многопоточного процесса может унаследовать чужие
+        захваченные блокировки. Дочерний процесс только пишет файл, ничего не печатает
+        и сообщает ошибку через pipe и код завершения.
+        Если потоков несколько или fork недоступен, клиника сериализуется pickle под
+        блокировкой - изменения ждут, пока идет сериализация, ее время растет с размером
+        клиники, - а восстановление и запись файла выполняет отдельный поток.
+        """
+        if not isinstance(clinic, Clinic):
+            raise CustomError("Ошибка: Фоновое сохранение поддерживает только Clinic, для шардов есть save().")
+        _reap_forked_saves()
+        with clinic._lock:
+            if hasattr(os, 'fork') and threading.active_count() == 1:
+                read_fd, write_fd = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    exit_code = 0
+                    try:
+                        os.close(read_fd)
+                        try:
+                            self._write(clinic, filename)
+                        except BaseException as ex:
+                            exit_code = 1
+                            message = (str(ex) or type(ex).__name__).encode(errors='replace')
+                            os.write(write_fd, message[:4096])
+                    finally:
+                        os._exit(exit_code)
+                os.close(write_fd)
+                handle = BackgroundSave(pid=pid, read_fd=read_fd)
+                with _forked_saves_lock:
+                    _forked_saves.append(handle)
+                return handle
+            data = pickle.dumps(clinic, protocol=pickle.HIGHEST_PROTOCOL)
+        return BackgroundSave(target=functools.partial(self._write_pickled, data, filename))
+
+    def _write_pickled(self, data: bytes, filename: str) -> None:
+        self._write(pickle.loads(data), filename)
+
 
 class JsonDataStorage(DataStorage):
+    EXTENSION = '.json'
+
     def save(self, clinic: Clinic, filename: str) -> None:
-        data = clinic.to_dict()
         try:
-            with open(filename, 'w') as file:
-                json.dump(data, file, indent=4)
+            self._write(clinic, filename)
         except Exception as ex:
             print(f"Ошибка при сохранении данных в JSON: {ex}")
 
+    def _write(self, clinic: Clinic, filename: str) -> None:
+        data = clinic.to_dict()
+        with _atomic_write(filename) as file:
+            json.dump(data, file, indent=4)
+
     def load(self, filename: str) -> Clinic:
         clinic = Clinic()
         try:
             with open(filename, 'r') as file:
                 data = json.load(file)
             for patient in data['patients']:
-                insurance = Insurance(patient['insurance']['provider'], patient['insurance']['policy_number'])
-                new_patient = Patient(patient['name'], patient['age'], insurance)
-                for record in patient['medical_records']:
-                    new_patient.add_medical_record(MedicalRecord(record['diagnosis'], record['treatment']))
-                for prescription in patient['prescriptions']:
-                    new_patient.add_prescription(Prescription(prescription['medication']))
-                for treatment_plan in patient['treatment_plans']:
-                    new_patient.add_treatment_plan(
-                        TreatmentPlan(treatment_plan['diagnosis'], treatment_plan['treatment_steps']))
-                clinic.add_patient(new_patient)
+                clinic.add_patient(_patient_from_dict(patient))
 
             for doctor in data['doctors']:
-                clinic.add_doctor(Doctor(doctor['name'], doctor['age'], doctor['specialty']))
+                clinic.add_doctor(_doctor_from_dict(doctor))
             for staff in data['staff']:
-                clinic.add_staff(Staff(staff['name'], staff['age'], staff['position']))
+                clinic.add_staff(_staff_from_dict(staff))
             for bill in data['bills']:
                 clinic.create_bill(bill['patient'], bill['amount'])
             for appointment in data['appointments']:
@@ -525,12 +1614,9 @@ class JsonDataStorage(DataStorage):
                 if patient and doctor:
                     clinic.add_appointment(Appointment(patient, doctor, appointment['date'], appointment['time']))
             for department in data['departments']:
-                dept = Department(department['name'])
-                for doctor in department['doctors']:
-                    dept.add_doctor(Doctor(doctor['name'], doctor['age'], doctor['specialty']))
-                clinic.add_department(dept)
+                clinic.add_department(_department_from_dict(department))
             for insurance in data.get('insurances', []):
-                clinic.add_insurance(Insurance(insurance['provider'], insurance['policy_number']))
+                clinic.add_insurance(_insurance_from_dict(insurance))
 
         except (FileNotFoundError, json.JSONDecodeError) as ex:
             print(f"Ошибка при загрузке данных из JSON: {ex}")
@@ -538,7 +1624,15 @@ class JsonDataStorage(DataStorage):
 
 
 class XmlDataStorage(DataStorage):
+    EXTENSION = '.xml'
+
     def save(self, clinic: Clinic, filename: str) -> None:
+        try:
+            self._write(clinic, filename)
+        except Exception as ex:
+            print(f"Ошибка при сохранении данных в XML: {ex}")
+
+    def _write(self, clinic: Clinic, filename: str) -> None:
         root = ET.Element("Clinic")
         self._add_patients(root, clinic)
         self._add_doctors(root, clinic)
@@ -547,11 +1641,8 @@ class XmlDataStorage(DataStorage):
         self._add_appointments(root, clinic)
         self._add_departments(root, clinic)
         self._add_insurances(root, clinic)
-        try:
-            tree = ET.ElementTree(root)
-            tree.write(filename)
-        except Exception as ex:
-            print(f"Ошибка при сохранении данных в XML: {ex}")
+        with _atomic_write(filename, 'wb') as file:
+            ET.ElementTree(root).write(file)
 
     def _add_patients(self, root: ET.Element, clinic: Clinic) -> None:
         patients = ET.SubElement(root, "Patients")
@@ -673,6 +1764,477 @@ class XmlDataStorage(DataStorage):
         return clinic
 
 
+_PARTITIONED_COLLECTIONS = ('patients', 'appointments', 'bills')
+
+_REPLICATED_KEYS = {
+    'doctors': 'name',
+    'staff': 'name',
+    'departments': 'name',
+    'insurances': 'policy_number',
+}
+
+
+def _relink_appointment(clinic: Clinic, appointment: Appointment) -> None:
+    patient = next((p for p in clinic.patients if p.name == appointment.patient.name), None)
+    doctor = next((d for d in clinic.doctors if d.name == appointment.doctor.name), None)
+    if patient:
+        appointment.patient = patient
+    if doctor:
+        appointment.doctor = doctor
+
+
+def _shard_worker(connection, storage: Optional[DataStorage], filename: Optional[str]) -> None:
+    clinic = Clinic()
+    if storage is not None and os.path.exists(filename):
+        clinic = storage.load(filename)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        method, args = message
+        try:
+            if method == 'save':
+                storage._write(clinic, filename)
+                result = None
+            else:
+                for argument in args:
+                    if isinstance(argument, Appointment):
+                        _relink_appointment(clinic, argument)
+                attribute = getattr(clinic, method)
+                result = attribute(*args) if callable(attribute) else attribute
+            connection.send((True, result))
+        except Exception as ex:
+            connection.send((False, ex))
+    connection.close()
+
+
+class ShardedQuery(Query):
+    """Запрос, который выполняется на всех шардах, а результаты объединяются."""
+
+    def count(self) -> int:
+        if self._collection in _REPLICATED_KEYS or self._limit is not None:
+            return len(self._execute())
+        return sum(self._clinic._fan_out('_run_query', self.spec(), 'count'))
+
+    def explain(self) -> str:
+        plans = self._clinic._fan_out('_run_query', self.spec(), 'explain')
+        return '; '.join(f"shard {shard}: {plan}" for shard, plan in enumerate(plans))
+
+    def _execute(self, limit: Optional[int] = None) -> List[Any]:
+        if limit is None or (self._limit is not None and self._limit < limit):
+            limit = self._limit
+        if self._collection in _REPLICATED_KEYS and not self._joins:
+            return self._clinic._call(0, '_run_query', self.spec(), 'all', limit)
+
+        parts = self._clinic._fan_out('_run_query', self.spec(), 'all', limit)
+        results = [item for part in parts for item in part]
+        key_field = _REPLICATED_KEYS.get(self._collection)
+        if key_field is not None:
+            unique = {}
+            for item in results:
+                unique.setdefault(getattr(item, key_field, None), item)
+            results = list(unique.values())
+        results = self._sorted(results)
+        if limit is not None:
+            results = results[:limit]
+        return results
+
+
+class ShardedClinic:
+    """Фасад клиники: пациенты с их счетами и приемами распределяются по процессам по хешу имени.
+
+    Врачи, персонал, отделы и страховки дублируются на все шарды.
+    Объекты, которые возвращают get_* и query(...).all(), - копии только для чтения:
+    их изменения не попадают в шард. Изменять данные нужно методами фасада,
+    например add_medical_record(patient_name, record) или update_patient(...).
+    Условия predicate передаются в процессы шардов, поэтому должны сериализоваться
+    через pickle (функции уровня модуля, а не lambda или замыкания).
+    Версии и дельты изменений ведутся отдельно для каждого шарда: changes_since и
+    apply_changes принимают списки по числу шардов, реплика должна иметь то же число шардов.
+
+    Атрибуты patients, doctors и т.д. собирают копии со всех шардов при каждом обращении,
+    поэтому фасад можно передать в DataStorage.save. Не поддерживаются: изменение этих
+    списков, блокировка _lock и DataStorage.save_in_background - фоновое сохранение
+    шардов выполняет save(), каждый шард пишет свой файл.
+    Имя файла шарда берется из filename_template, по умолчанию clinic_shard_{}
+    с расширением хранилища (EXTENSION).
+    """
+
+    def __init__(self, shard_count: Optional[int] = None, storage: Optional[DataStorage] = None,
+                 filename_template: Optional[str] = None) -> None:
+        shard_count = os.cpu_count() or 1 if shard_count is None else shard_count
+        if not isinstance(shard_count, int) or shard_count <= 0:
+            raise CustomError("Ошибка: Количество шардов должно быть положительным целым числом.")
+        if storage is not None and filename_template is None:
+            if storage.EXTENSION is None:
+                raise CustomError("Ошибка: Для этого хранилища нужно задать filename_template.")
+            filename_template = 'clinic_shard_{}' + storage.EXTENSION
+        self.shard_count = shard_count
+        self._storage = storage
+        self._connections = []
+        self._processes = []
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+        for shard in range(shard_count):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            filename = filename_template.format(shard) if storage is not None else None
+            process = multiprocessing.Process(target=_shard_worker, args=(child_connection, storage, filename),
+                                              daemon=True)
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+
+    def __enter__(self) -> 'ShardedClinic':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for shard, connection in enumerate(self._connections):
+            with self._locks[shard]:
+                connection.send(None)
+                connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def save(self) -> bool:
+        try:
+            if self._storage is None:
+                raise CustomError("Ошибка: Хранилище для шардов не задано.")
+            self._fan_out('save')
+            return True
+        except CustomError as ex:
+            print(ex)
+        except Exception as ex:
+            print(f"Ошибка при сохранении шардов: {ex}")
+        return False
+
+    def _shard_of(self, name: str) -> int:
+        return zlib.crc32(str(name).encode()) % self.shard_count
+
+    def _call(self, shard: int, method: str, *args: Any) -> Any:
+        with self._locks[shard]:
+            self._connections[shard].send((method, args))
+            success, result = self._connections[shard].recv()
+        if not success:
+            raise result
+        return result
+
+    def _fan_out(self, method: str, *args: Any) -> List[Any]:
+        return self._fan_out_each(method, [args] * self.shard_count)
+
+    def _fan_out_each(self, method: str, shard_args: List[tuple]) -> List[Any]:
+        if len(shard_args) != self.shard_count:
+            raise CustomError("Ошибка: Число аргументов не совпадает с числом шардов.")
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for connection, args in zip(self._connections, shard_args):
+                connection.send((method, tuple(args)))
+            replies = [connection.recv() for connection in self._connections]
+        finally:
+            for lock in self._locks:
+                lock.release()
+        for success, result in replies:
+            if not success:
+                raise result
+        return [result for _, result in replies]
+
+    def _merge(self, method: str, *args: Any) -> List[Any]:
+        return [item for part in self._fan_out(method, *args) for item in part]
+
+    def query(self, collection: str) -> ShardedQuery:
+        return ShardedQuery(self, collection)
+
+    @property
+    def patients(self) -> List[Patient]:
+        return self._merge('patients')
+
+    @property
+    def doctors(self) -> List[Doctor]:
+        return self._call(0, 'doctors')
+
+    @property
+    def staff(self) -> List[Staff]:
+        return self._call(0, 'staff')
+
+    @property
+    def appointments(self) -> List[Appointment]:
+        return self._merge('appointments')
+
+    @property
+    def departments(self) -> List[Department]:
+        return self._call(0, 'departments')
+
+    @property
+    def bills(self) -> List[Bill]:
+        return self._merge('bills')
+
+    @property
+    def insurances(self) -> List[Insurance]:
+        return self._call(0, 'insurances')
+
+    @property
+    def version(self) -> List[int]:
+        return self._fan_out('version')
+
+    def changes_since(self, versions: List[int]) -> List[dict]:
+        return self._fan_out_each('changes_since', [(version,) for version in versions])
+
+    def apply_changes(self, deltas: List[dict]) -> None:
+        self._fan_out_each('apply_changes', [(delta,) for delta in deltas])
+
+    def compact_changes(self, versions: List[int]) -> None:
+        self._fan_out_each('compact_changes', [(version,) for version in versions])
+
+    def get_patients(self) -> List[dict]:
+        return self._merge('get_patients')
+
+    def get_doctors(self) -> List[dict]:
+        return self._call(0, 'get_doctors')
+
+    def get_staffs(self) -> List[dict]:
+        return self._call(0, 'get_staffs')
+
+    def get_appointments(self) -> List[dict]:
+        return self._merge('get_appointments')
+
+    def get_departments(self) -> List[dict]:
+        return self._call(0, 'get_departments')
+
+    def get_bills(self) -> List[dict]:
+        return self._merge('get_bills')
+
+    def get_insurances(self) -> List[dict]:
+        return self._call(0, 'get_insurances')
+
+    def iter_patients(self, predicate: Optional[Callable[[Patient], bool]] = None) -> Iterator[dict]:
+        return self._iter_pages('get_patients_page', predicate)
+
+    def iter_doctors(self, predicate: Optional[Callable[[Doctor], bool]] = None) -> Iterator[dict]:
+        return self._iter_pages('get_doctors_page', predicate)
+
+    def iter_staffs(self, predicate: Optional[Callable[[Staff], bool]] = None) -> Iterator[dict]:
+        return self._iter_pages('get_staffs_page', predicate)
+
+    def iter_appointments(self, predicate: Optional[Callable[[Appointment], bool]] = None) -> Iterator[dict]:
+        return self._iter_pages('get_appointments_page', predicate)
+
+    def iter_departments(self, predicate: Optional[Callable[[Department], bool]] = None) -> Iterator[dict]:
+        return self._iter_pages('get_departments_page', predicate)
+
+    def iter_bills(self, predicate: Optional[Callable[[Bill], bool]] = None) -> Iterator[dict]:
+        return self._iter_pages('get_bills_page', predicate)
+
+    def iter_insurances(self, predicate: Optional[Callable[[Insurance], bool]] = None) -> Iterator[dict]:
+        return self._iter_pages('get_insurances_page', predicate)
+
+    def get_patients_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                          predicate: Optional[Callable[[Patient], bool]] = None) -> dict:
+        return self._get_page('patients', cursor, page_size, predicate)
+
+    def get_doctors_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                         predicate: Optional[Callable[[Doctor], bool]] = None) -> dict:
+        return self._get_page('doctors', cursor, page_size, predicate)
+
+    def get_staffs_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                        predicate: Optional[Callable[[Staff], bool]] = None) -> dict:
+        return self._get_page('staff', cursor, page_size, predicate)
+
+    def get_appointments_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                              predicate: Optional[Callable[[Appointment], bool]] = None) -> dict:
+        return self._get_page('appointments', cursor, page_size, predicate)
+
+    def get_departments_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                             predicate: Optional[Callable[[Department], bool]] = None) -> dict:
+        return self._get_page('departments', cursor, page_size, predicate)
+
+    def get_bills_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                       predicate: Optional[Callable[[Bill], bool]] = None) -> dict:
+        return self._get_page('bills', cursor, page_size, predicate)
+
+    def get_insurances_page(self, cursor: Optional[str] = None, page_size: int = 50,
+                            predicate: Optional[Callable[[Insurance], bool]] = None) -> dict:
+        return self._get_page('insurances', cursor, page_size, predicate)
+
+    @staticmethod
+    def _check_predicate(predicate: Optional[Callable[[Any], bool]]) -> None:
+        if predicate is None:
+            return
+        try:
+            pickle.dumps(predicate)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            raise CustomError("Ошибка: Условие для шардов должно быть функцией уровня модуля, "
+                              "lambda и замыкания не поддерживаются.")
+
+    def _iter_pages(self, page_method: str, predicate: Optional[Callable[[Any], bool]]) -> Iterator[dict]:
+        cursor = None
+        while True:
+            page = getattr(self, page_method)(cursor, 100, predicate)
+            if page is None:
+                return
+            yield from page['items']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    def _get_page(self, collection: str, cursor: Optional[str], page_size: int,
+                  predicate: Optional[Callable[[Any], bool]]) -> dict:
+        try:
+            _check_page_size(page_size)
+            self._check_predicate(predicate)
+            if collection not in _PARTITIONED_COLLECTIONS:
+                return self._call(0, '_get_page', collection, cursor, page_size, predicate)
+            shard, inner_cursor = 0, None
+            if cursor is not None:
+                try:
+                    shard, inner_cursor = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+                except (AttributeError, TypeError, ValueError):
+                    raise CustomError("Ошибка: Некорректный курсор страницы.")
+            items = []
+            while shard < self.shard_count and len(items) < page_size:
+                page = self._call(shard, '_get_page', collection, inner_cursor, page_size - len(items), predicate)
+                if page is None:
+                    return None
+                items.extend(page['items'])
+                inner_cursor = page['next_cursor']
+                if inner_cursor is None:
+                    shard += 1
+            next_cursor = None
+            if shard < self.shard_count:
+                next_cursor = base64.urlsafe_b64encode(json.dumps([shard, inner_cursor]).encode()).decode()
+            return {
+                'items': items,
+                'next_cursor': next_cursor
+            }
+        except CustomError as ex:
+            print(ex)
+
+    def add_patient(self, patient: Patient) -> None:
+        self._call(self._shard_of(getattr(patient, 'name', '')), 'add_patient', patient)
+
+    def get_patient(self, name: str) -> Patient:
+        return self._call(self._shard_of(name), 'get_patient', name)
+
+    def update_patient(self, name: str, updated_patient: Patient) -> None:
+        try:
+            shard = self._shard_of(name)
+            if self._shard_of(getattr(updated_patient, 'name', '')) != shard:
+                raise CustomError("Ошибка: Новое имя пациента относится к другому шарду.")
+            self._call(shard, 'update_patient', name, updated_patient)
+        except CustomError as ex:
+            print(ex)
+
+    def remove_patient(self, patient_name: str) -> None:
+        self._call(self._shard_of(patient_name), 'remove_patient', patient_name)
+
+    def add_medical_record(self, patient_name: str, record: MedicalRecord) -> None:
+        self._call(self._shard_of(patient_name), 'add_medical_record', patient_name, record)
+
+    def update_medical_record(self, patient_name: str, index: int, diagnosis: str, treatment: str) -> None:
+        self._call(self._shard_of(patient_name), 'update_medical_record', patient_name, index, diagnosis, treatment)
+
+    def add_prescription(self, patient_name: str, prescription: Prescription) -> None:
+        self._call(self._shard_of(patient_name), 'add_prescription', patient_name, prescription)
+
+    def update_prescription(self, patient_name: str, index: int, medication: str) -> None:
+        self._call(self._shard_of(patient_name), 'update_prescription', patient_name, index, medication)
+
+    def add_treatment_plan(self, patient_name: str, treatment_plan: TreatmentPlan) -> None:
+        self._call(self._shard_of(patient_name), 'add_treatment_plan', patient_name, treatment_plan)
+
+    def add_insurance(self, insurance: Insurance) -> None:
+        self._fan_out('add_insurance', insurance)
+
+    def get_insurance(self, policy_number: str) -> Insurance:
+        return self._call(0, 'get_insurance', policy_number)
+
+    def update_insurance(self, policy_number: str, updated_insurance: Insurance) -> None:
+        self._fan_out('update_insurance', policy_number, updated_insurance)
+
+    def remove_insurance(self, policy_number: str) -> None:
+        self._fan_out('remove_insurance', policy_number)
+
+    def add_doctor(self, doctor: Doctor) -> None:
+        self._fan_out('add_doctor', doctor)
+
+    def get_doctor(self, name: str) -> Doctor:
+        return self._call(0, 'get_doctor', name)
+
+    def update_doctor(self, name: str, updated_doctor: Doctor) -> None:
+        self._fan_out('update_doctor', name, updated_doctor)
+
+    def remove_doctor(self, doctor_name: str) -> None:
+        self._fan_out('remove_doctor', doctor_name)
+
+    def add_staff(self, staff_member: Staff) -> None:
+        self._fan_out('add_staff', staff_member)
+
+    def get_staff(self, name: str) -> Staff:
+        return self._call(0, 'get_staff', name)
+
+    def update_staff(self, name: str, updated_staff: Staff) -> None:
+        self._fan_out('update_staff', name, updated_staff)
+
+    def remove_staff(self, staff_name: str) -> None:
+        self._fan_out('remove_staff', staff_name)
+
+    def add_appointment(self, appointment: Appointment) -> None:
+        self._call(self._shard_of(appointment.patient.name), 'add_appointment', appointment)
+
+    def get_appointment(self, patient_name: str, doctor_name: str) -> Appointment:
+        return self._call(self._shard_of(patient_name), 'get_appointment', patient_name, doctor_name)
+
+    def update_appointment(self, patient_name: str, doctor_name: str, updated_appointment: Appointment) -> None:
+        try:
+            shard = self._shard_of(patient_name)
+            if self._shard_of(updated_appointment.patient.name) != shard:
+                raise CustomError("Ошибка: Новый пациент назначения относится к другому шарду.")
+            self._call(shard, 'update_appointment', patient_name, doctor_name, updated_appointment)
+        except CustomError as ex:
+            print(ex)
+
+    def remove_appointment(self, patient_name: str, doctor_name: str) -> None:
+        self._call(self._shard_of(patient_name), 'remove_appointment', patient_name, doctor_name)
+
+    def add_department(self, department: Department) -> None:
+        self._fan_out('add_department', department)
+
+    def get_department(self, name: str) -> Department:
+        return self._call(0, 'get_department', name)
+
+    def update_department(self, name: str, updated_department: Department) -> None:
+        self._fan_out('update_department', name, updated_department)
+
+    def remove_department(self, department_name: str) -> None:
+        self._fan_out('remove_department', department_name)
+
+    def add_department_doctor(self, department_name: str, doctor: Doctor) -> None:
+        self._fan_out('add_department_doctor', department_name, doctor)
+
+    def create_bill(self, patient_name: str, amount: float) -> None:
+        self._call(self._shard_of(patient_name), 'create_bill', patient_name, amount)
+
+    def get_bill(self, patient_name: str) -> Bill:
+        return self._call(self._shard_of(patient_name), 'get_bill', patient_name)
+
+    def update_bill(self, patient_name: str, new_amount: float) -> None:
+        self._call(self._shard_of(patient_name), 'update_bill', patient_name, new_amount)
+
+    def remove_bill(self, patient_name: str) -> None:
+        self._call(self._shard_of(patient_name), 'remove_bill', patient_name)
+
+    def to_dict(self) -> dict:
+        parts = self._fan_out('to_dict')
+        data = dict(parts[0])
+        for collection in _PARTITIONED_COLLECTIONS:
+            data[collection] = [entry for part in parts for entry in part[collection]]
+        return data
+
+
 if __name__ == "__main__":
     clinic = Clinic()
 
@@ -765,3 +2327,21 @@ if __name__ == "__main__":
     print("\nОбновление информации о счете:")
     loaded_clinic_json.update_bill("Luis Scott", 884)
     print(loaded_clinic_json.get_bill("Luis Scott"))
+
+    print("\nПациенты старше 30 лет со счетом больше 500 и приемом у кардиолога в ноябре:")
+    patients_query = (loaded_clinic_json.query('patients')
+                      .where('age', '>=', 30)
+                      .join('bills', loaded_clinic_json.query('bills').where('amount', '>', 500))
+                      .join('appointments', loaded_clinic_json.query('appointments')
+                            .where('date', 'between', ('01-11-2024', '30-11-2024'))
+                            .where('doctor.specialty', '==', 'Cardiology'))
+                      .order_by('age', descending=True)
+                      .limit(10))
+    print(patients_query.explain())
+    print(patients_query.to_dicts())
+
+    print("\nПостраничный вывод пациентов:")
+    page = loaded_clinic_json.get_patients_page(page_size=1)
+    while page:
+        print([patient['name'] for patient in page['items']])
+        page = loaded_clinic_json.get_patients_page(page['next_cursor'], page_size=1) if page['next_cursor'] else None
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Appointment, Clinic, Department, Doctor, Insurance, Patient  # noqa: E402
+
+
+@pytest.fixture
+def make_patient():
+    def make(name: str, age: int) -> Patient:
+        return Patient(name, age, Insurance("Amica Mutual Insurance", f"HC-{name}"))
+    return make
+
+
+@pytest.fixture
+def clinic(make_patient) -> Clinic:
+    clinic = Clinic()
+    cardiologist = Doctor("Dr. Joshua Lopez", 42, "Cardiology")
+    neurologist = Doctor("Dr. John Doe", 59, "Neurology")
+    department = Department("Neurology")
+    clinic.add_doctor(cardiologist)
+    clinic.add_doctor(neurologist)
+    clinic.add_department(department)
+    department.add_doctor(neurologist)
+    for index, age in enumerate((25, 61, 64, 70, 82)):
+        patient = make_patient(f"Patient {index}", age)
+        clinic.add_patient(patient)
+        clinic.add_insurance(patient.insurance)
+        clinic.create_bill(patient.name, 300.0 + index * 100)
+        doctor = cardiologist if index % 2 else neurologist
+        clinic.add_appointment(Appointment(patient, doctor, f"{10 + index:02d}-11-2024", "08:00 AM"))
+    return clinic
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import pytest
+
+from main import Clinic, JsonDataStorage, ShardedClinic, XmlDataStorage
+
+NAMES = [f"Patient {index}" for index in range(5)]
+
+
+@pytest.fixture
+def forks(monkeypatch):
+    calls = []
+    if hasattr(os, 'fork'):
+        fork = os.fork
+
+        def counting_fork():
+            calls.append(1)
+            return fork()
+        monkeypatch.setattr(os, 'fork', counting_fork)
+    return calls
+
+
+@pytest.fixture(params=['fork', 'thread'])
+def method(request, monkeypatch, forks):
+    if request.param == 'fork' and not hasattr(os, 'fork'):
+        pytest.skip("os.fork недоступен")
+    if request.param == 'thread':
+        monkeypatch.delattr(os, 'fork', raising=False)
+    return request.param
+
+
+@pytest.mark.parametrize('storage', [JsonDataStorage(), XmlDataStorage()], ids=['json', 'xml'])
+def test_background_save_writes_snapshot(method, forks, clinic, storage, tmp_path):
+    filename = str(tmp_path / f"clinic{storage.EXTENSION}")
+    handle = storage.save_in_background(clinic, filename)
+    clinic.remove_patient("Patient 0")
+    assert handle.wait() is True
+    assert handle.done() and handle.error is None
+    assert [patient.name for patient in storage.load(filename).patients] == NAMES
+    assert os.listdir(tmp_path) == [f"clinic{storage.EXTENSION}"]
+    assert len(forks) == (1 if method == 'fork' else 0)
+
+
+def test_background_save_reports_failure(method, clinic, tmp_path):
+    handle = JsonDataStorage().save_in_background(clinic, str(tmp_path / 'missing' / 'clinic.json'))
+    assert handle.wait() is False
+    assert handle.error
+
+
+def test_no_fork_while_other_threads_run(forks, clinic, tmp_path):
+    release = threading.Event()
+    worker = threading.Thread(target=release.wait)
+    worker.start()
+    try:
+        handle = JsonDataStorage().save_in_background(clinic, str(tmp_path / 'clinic.json'))
+        assert handle.wait() is True
+    finally:
+        release.set()
+        worker.join()
+    assert forks == []
+    assert len(JsonDataStorage().load(str(tmp_path / 'clinic.json')).patients) == 5
+
+
+def test_failed_save_keeps_previous_file(clinic, tmp_path, monkeypatch):
+    storage = JsonDataStorage()
+    filename = str(tmp_path / 'clinic.json')
+    storage.save(clinic, filename)
+    monkeypatch.setattr(Clinic, 'to_dict', lambda self: {'patients': [object()]})
+    storage.save(clinic, filename)
+    monkeypatch.undo()
+    assert len(storage.load(filename).patients) == 5
+    assert os.listdir(tmp_path) == ['clinic.json']
+
+
+def test_snapshot_is_a_working_clinic(clinic):
+    snapshot = clinic.snapshot()
+    snapshot.get_patient("Patient 0").age = 99
+    assert [patient.name for patient in snapshot.query('patients').where('age', '>=', 90).all()] == ["Patient 0"]
+    assert clinic.query('patients').where('age', '>=', 90).all() == []
+    version = snapshot.version
+    snapshot.update_bill("Patient 1", 5.0)
+    assert [change['collection'] for change in snapshot.changes_since(version)['changes']] == ['bills']
+    assert all('patient_data' not in change['data'] for change in snapshot.changes_since(0)['changes']
+               if change['collection'] == 'bills')
+
+
+def test_sharded_save_is_synchronous(make_patient, tmp_path):
+    template = str(tmp_path / 'shard_{}.json')
+    with ShardedClinic(2, JsonDataStorage(), template) as sharded:
+        for index in range(6):
+            sharded.add_patient(make_patient(f"Patient {index}", 40))
+        assert sharded.save() is True
+        names = [patient.name for shard in range(2)
+                 for patient in JsonDataStorage().load(template.format(shard)).patients]
+    assert sorted(names) == [f"Patient {index}" for index in range(6)]
+    with ShardedClinic(2, JsonDataStorage(), template) as restored:
+        assert len(restored.get_patients()) == 6
+
+
+def test_sharded_save_reports_failure(tmp_path, capsys):
+    template = str(tmp_path / 'missing' / 'shard_{}.json')
+    with ShardedClinic(2, JsonDataStorage(), template) as sharded:
+        assert sharded.save() is False
+    assert "Ошибка при сохранении шардов" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+import pytest
+
+from main import Clinic, CustomError, Doctor
+
+NAMES = [f"Patient {index}" for index in range(5)]
+
+
+def collect_pages(clinic: Clinic, page_size: int, predicate=None) -> list:
+    names = []
+    page = clinic.get_patients_page(page_size=page_size, predicate=predicate)
+    while True:
+        names.extend(patient['name'] for patient in page['items'])
+        if page['next_cursor'] is None:
+            return names
+        page = clinic.get_patients_page(page['next_cursor'], page_size, predicate)
+
+
+def test_pages_follow_insertion_order(clinic):
+    assert collect_pages(clinic, 2) == NAMES
+    assert [patient['name'] for patient in clinic.iter_patients()] == NAMES
+
+
+def test_last_full_page_has_no_cursor(clinic):
+    page = clinic.get_patients_page(page_size=5)
+    assert len(page['items']) == 5
+    assert page['next_cursor'] is None
+
+
+def test_cursor_is_stable_across_removals_and_updates(clinic, make_patient):
+    page = clinic.get_patients_page(page_size=2)
+    clinic.remove_patient("Patient 1")
+    clinic.remove_patient("Patient 2")
+    clinic.update_patient("Patient 3", make_patient("Patient 3b", 40))
+    clinic.add_patient(make_patient("Patient 5", 50))
+    rest = clinic.get_patients_page(page['next_cursor'], page_size=100)
+    assert [patient['name'] for patient in rest['items']] == ["Patient 3b", "Patient 4", "Patient 5"]
+
+
+def test_predicate_filters_rows(clinic):
+    assert collect_pages(clinic, 1, lambda patient: patient.age % 2 == 0) == ["Patient 2", "Patient 3", "Patient 4"]
+
+
+def test_invalid_cursor_and_page_size(clinic, capsys):
+    assert clinic.get_patients_page("not-a-cursor") is None
+    assert clinic.get_patients_page(page_size=0) is None
+    assert clinic.get_patients_page(page_size=True) is None
+    patients_cursor = clinic.get_patients_page(page_size=1)['next_cursor']
+    assert clinic.get_doctors_page(patients_cursor) is None
+    assert "Ошибка" in capsys.readouterr().out
+    assert clinic.get_staffs_page() == {'items': [], 'next_cursor': None}
+
+
+def test_direct_list_edits_are_reported(clinic, make_patient, capsys):
+    clinic.patients.append(make_patient("Intruder", 1))
+    assert list(clinic.iter_patients()) == []
+    assert clinic.get_patients_page() is None
+    assert capsys.readouterr().out.count("в обход методов Clinic") == 2
+    with pytest.raises(CustomError):
+        clinic.query('patients').where('age', '<', 5).all()
+    with pytest.raises(CustomError):
+        clinic.query('patients').all()
+
+
+def test_iteration_survives_shared_entities():
+    first, second = Clinic(), Clinic()
+    shared, other = Doctor("D1", 40, "Cardiology"), Doctor("D2", 41, "Neurology")
+    first.add_doctor(shared)
+    first.add_doctor(other)
+    second.add_doctor(Doctor("X", 50, "Surgery"))
+    second.add_doctor(shared)
+    first.add_doctor(shared)
+    assert [doctor['name'] for doctor in first.iter_doctors()] == ["D1", "D2", "D1"]
+    assert [doctor['name'] for doctor in second.iter_doctors()] == ["X", "D1"]
+
+
+def test_iter_to_dict_is_lazy(clinic):
+    iterator = clinic.iter_patients()
+    assert next(iterator)['name'] == "Patient 0"
+    clinic.remove_patient("Patient 1")
+    assert next(iterator)['name'] == "Patient 2"
@@ -0,0 +1,101 @@
+import operator
+
+import pytest
+
+from main import Appointment, CustomError, SortedIndex
+
+
+def test_query_matches_scan(clinic):
+    query = (clinic.query('patients')
+             .where('age', '>=', 60)
+             .join('bills', clinic.query('bills').where('amount', '>', 500))
+             .join('appointments', clinic.query('appointments').where('doctor.specialty', '==', 'Cardiology')))
+    expected = [patient for patient in clinic.patients
+                if patient.age >= 60
+                and any(bill.patient is patient and bill.amount > 500 for bill in clinic.bills)
+                and any(appointment.patient is patient and appointment.doctor.specialty == 'Cardiology'
+                        for appointment in clinic.appointments)]
+    assert query.all() == expected
+
+
+def test_planner_uses_most_selective_index(clinic):
+    query = clinic.query('patients').where('age', '>=', 0).where('age', '>', 80)
+    assert query.explain() == "index patients.age > (1 rows)"
+
+
+def test_order_by_and_limit(clinic):
+    names = [patient['name'] for patient in clinic.query('patients').order_by('age', descending=True).limit(2).to_dicts()]
+    assert names == ["Patient 4", "Patient 3"]
+
+
+def test_index_follows_direct_attribute_changes(clinic):
+    patient = clinic.get_patient("Patient 0")
+    patient.age = 90
+    assert clinic.query('patients').where('age', '>=', 85).all() == [patient]
+    clinic.bills[0].amount = 5
+    assert clinic.query('bills').where('amount', '<', 10).all() == [clinic.bills[0]]
+
+
+def test_removed_items_leave_index(clinic):
+    clinic.remove_patient("Patient 4")
+    clinic.remove_bill("Patient 4")
+    assert clinic.query('patients').where('age', '>', 80).count() == 0
+    assert clinic.query('bills').where('amount', '>=', 700).count() == 0
+
+
+def test_mixed_amount_types_do_not_break_index(clinic):
+    clinic.create_bill("Patient 0", "100")
+    clinic.create_bill("Patient 0", 50)
+    assert [bill.amount for bill in clinic.query('bills').where('amount', '<', 100).all()] == [50]
+    amounts = [bill.amount for bill in clinic.query('bills').order_by('amount').all()]
+    assert amounts == [50, 300.0, 400.0, 500.0, 600.0, 700.0, "100"]
+    amounts = [bill.amount for bill in clinic.query('bills').order_by('amount', descending=True).all()]
+    assert amounts == [700.0, 600.0, 500.0, 400.0, 300.0, 50, "100"]
+
+
+def test_index_handles_many_equal_keys(clinic, make_patient):
+    for index in range(200):
+        clinic.add_patient(make_patient(f"Twin {index}", 40))
+    twin = clinic.get_patient("Twin 150")
+    twin.age = 41
+    clinic.remove_patient("Twin 10")
+    assert clinic.query('patients').where('age', '==', 41).all() == [twin]
+    assert clinic.query('patients').where('age', '==', 40).count() == 198
+
+
+def test_date_ranges_accept_both_formats(clinic):
+    patient = clinic.get_patient("Patient 0")
+    doctor = clinic.get_doctor("Dr. John Doe")
+    clinic.add_appointment(Appointment(patient, doctor, "2024-11-20", "09:00 AM"))
+    clinic.add_appointment(Appointment(patient, doctor, "someday", "09:00 AM"))
+    dates = [appointment.date for appointment in
+             clinic.query('appointments').where('date', 'between', ('13-11-2024', '30-11-2024')).order_by('date').all()]
+    assert dates == ["13-11-2024", "14-11-2024", "2024-11-20"]
+
+
+def test_invalid_query_values_raise(clinic):
+    with pytest.raises(CustomError):
+        clinic.query('appointments').where('date', '>', 'tomorrow')
+    with pytest.raises(CustomError):
+        clinic.query('patients').where('age', '~', 1)
+    with pytest.raises(CustomError):
+        clinic.query('bills').join('doctor')
+
+
+def test_index_blocks_match_scan(clinic, make_patient, monkeypatch):
+    monkeypatch.setattr(SortedIndex, '_LOAD', 2)
+    clinic.reindex()
+    patients = [make_patient(f"Extra {index}", index * 7 % 13) for index in range(40)]
+    for patient in patients:
+        clinic.add_patient(patient)
+    for index, patient in enumerate(patients[::3]):
+        patient.age = index % 5
+    for patient in patients[::4]:
+        clinic.remove_patient(patient.name)
+    comparisons = {'<': operator.lt, '<=': operator.le, '==': operator.eq, '>=': operator.ge, '>': operator.gt}
+    for symbol, compare in comparisons.items():
+        for age in (0, 3, 6, 12, 70):
+            query = clinic.query('patients').where('age', symbol, age)
+            expected = [patient for patient in clinic.patients if compare(patient.age, age)]
+            assert sorted(map(id, query.all())) == sorted(map(id, expected))
+            assert query.count() == len(expected)
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from main import Clinic, CustomError, Doctor, Insurance, MedicalRecord, Patient, ShardedClinic
+
+
+def ship(delta: dict) -> dict:
+    return json.loads(json.dumps(delta))
+
+
+def replicate(primary: Clinic) -> Clinic:
+    replica = Clinic()
+    replica.apply_changes(ship(primary.changes_since(0)))
+    return replica
+
+
+def catch_up(primary: Clinic, replica: Clinic) -> None:
+    replica.apply_changes(ship(primary.changes_since(replica.version)))
+    assert replica.to_dict() == primary.to_dict()
+    assert replicate(primary).to_dict() == primary.to_dict()
+
+
+def test_full_catch_up_matches_primary(clinic):
+    replica = replicate(clinic)
+    assert replica.to_dict() == clinic.to_dict()
+    assert replica.version == clinic.version
+
+
+def test_incremental_changes(clinic):
+    replica = replicate(clinic)
+    version = replica.version
+
+    clinic.get_patient("Patient 1").add_medical_record(MedicalRecord("Migraine", "Pain medications"))
+    clinic.update_bill("Patient 2", 999.0)
+    clinic.get_patient("Patient 3").age = 80
+    clinic.remove_appointment("Patient 4", "Dr. John Doe")
+    clinic.update_doctor("Dr. John Doe", Doctor("Dr. John Doe", 60, "Neurology"))
+
+    delta = clinic.changes_since(version)
+    assert {change['collection'] for change in delta['changes']} == {'patients', 'bills', 'appointments', 'doctors'}
+    catch_up(clinic, replica)
+    assert replica.query('patients').where('age', '>=', 80).join('bills').count() == 2
+
+
+def test_replaced_patient_keeps_old_references(clinic):
+    replica = replicate(clinic)
+    clinic.update_patient("Patient 1", Patient("Patient 9", 19, Insurance("CVS Health", "TR-9")))
+    catch_up(clinic, replica)
+    assert [bill['patient'] for bill in replica.get_bills()][1] == "Patient 1"
+
+
+def test_shared_insurance_edits_reach_patients(clinic):
+    replica = replicate(clinic)
+    clinic.get_insurance("HC-Patient 0").provider = "CVS Health"
+    catch_up(clinic, replica)
+    assert replica.get_patient("Patient 0").insurance.provider == "CVS Health"
+
+
+def test_department_doctor_edits_are_replicated(clinic):
+    replica = replicate(clinic)
+    clinic.get_doctor("Dr. John Doe").age = 77
+    catch_up(clinic, replica)
+    assert replica.get_department("Neurology").doctors[0].age == 77
+    assert replica.query('doctors').where('age', '==', 77).join('appointments').count() == 1
+
+
+def test_nested_record_edits_are_replicated(clinic):
+    patient = clinic.get_patient("Patient 2")
+    patient.add_medical_record(MedicalRecord("Hypertension", "Lifestyle changes"))
+    replica = replicate(clinic)
+    patient.medical_records[0].treatment = "Beta blockers"
+    patient.name = "Patient 2b"
+    catch_up(clinic, replica)
+
+
+def test_references_to_removed_entities_are_replicated(clinic):
+    replica = replicate(clinic)
+    clinic.remove_patient("Patient 0")
+    clinic.remove_doctor("Dr. John Doe")
+    catch_up(clinic, replica)
+    clinic.bills[0].patient.age = 3
+    catch_up(clinic, replica)
+    assert len(replica.bills) == 5
+
+
+def test_duplicate_names_resolve_to_first_match(clinic, make_patient):
+    clinic.add_patient(make_patient("Patient 0", 99))
+    clinic.create_bill("Patient 0", 1.0)
+    replica = replicate(clinic)
+    assert replica.query('patients').where('age', '==', 25).join('bills').count() == 1
+    assert replica.query('patients').where('age', '==', 99).join('bills').count() == 0
+
+
+def test_unresolvable_reference_fails_loudly():
+    replica = Clinic()
+    delta = {'version': 1, 'changes': [{'collection': 'bills', 'id': 0, 'data': {'patient': "Ghost", 'amount': 1.0}}]}
+    with pytest.raises(CustomError):
+        replica.apply_changes(delta)
+
+
+def test_compaction_forces_reset(clinic):
+    replica = replicate(clinic)
+    stale_version = replica.version
+    clinic.remove_patient("Patient 1")
+    clinic.compact_changes(clinic.version)
+
+    delta = clinic.changes_since(stale_version)
+    assert delta['reset'] is True
+    replica.apply_changes(ship(delta))
+    assert replica.to_dict() == clinic.to_dict()
+    assert replica.version == clinic.version
+    assert clinic.changes_since(clinic.version) == {'version': clinic.version, 'reset': False, 'changes': []}
+
+
+def test_sharded_change_feed(make_patient):
+    with ShardedClinic(2) as primary, ShardedClinic(2) as replica:
+        for index in range(6):
+            primary.add_patient(make_patient(f"Patient {index}", 40 + index))
+            primary.create_bill(f"Patient {index}", 10.0 * index)
+        replica.apply_changes(primary.changes_since([0, 0]))
+        primary.update_bill("Patient 3", 500.0)
+        replica.apply_changes(primary.changes_since(replica.version))
+        assert replica.version == primary.version
+        assert sorted(replica.get_bills(), key=str) == sorted(primary.get_bills(), key=str)
@@ -0,0 +1,114 @@
+import pytest
+
+from main import (Appointment, CustomError, DataStorage, Department, Doctor, JsonDataStorage, MedicalRecord, Patient,
+                  Prescription, ShardedClinic, XmlDataStorage)
+
+NAMES = [f"Patient {index}" for index in range(12)]
+
+
+def is_senior(patient: Patient) -> bool:
+    return patient.age >= 60
+
+
+def shard_contents(sharded: ShardedClinic, collection: str) -> list:
+    deltas = sharded.changes_since([0] * sharded.shard_count)
+    return [[change['data'] for change in delta['changes'] if change['collection'] == collection]
+            for delta in deltas]
+
+
+@pytest.fixture
+def sharded(make_patient):
+    with ShardedClinic(3) as clinic:
+        cardiologist = Doctor("Dr. Joshua Lopez", 42, "Cardiology")
+        clinic.add_doctor(cardiologist)
+        clinic.add_doctor(Doctor("Dr. John Doe", 59, "Neurology"))
+        for index, name in enumerate(NAMES):
+            patient = make_patient(name, 20 + index * 5)
+            clinic.add_patient(patient)
+            clinic.create_bill(patient.name, 100.0 * index)
+            if index % 3 == 0:
+                clinic.add_appointment(Appointment(patient, cardiologist, "14-11-2024", "08:00 AM"))
+        yield clinic
+
+
+def test_patients_and_their_bills_share_one_shard(sharded):
+    patients = [{patient['name'] for patient in part} for part in shard_contents(sharded, 'patients')]
+    bills = [{bill['patient'] for bill in part} for part in shard_contents(sharded, 'bills')]
+    assert sorted(name for part in patients for name in part) == sorted(NAMES)
+    assert sum(len(part) for part in patients) == len(NAMES)
+    assert sum(1 for part in patients if part) > 1
+    assert bills == patients
+
+
+def test_fan_out_reads_merge_all_shards(sharded):
+    data = sharded.to_dict()
+    assert sorted(patient['name'] for patient in data['patients']) == sorted(NAMES)
+    assert len(data['bills']) == 12
+    assert len(data['doctors']) == 2
+    assert len(sharded.get_doctors()) == 2
+    assert sorted(patient.name for patient in sharded.patients) == sorted(NAMES)
+    assert len(sharded.appointments) == 4
+    assert [doctor.name for doctor in sharded.doctors] == ["Dr. Joshua Lopez", "Dr. John Doe"]
+
+
+def test_routed_patient_methods_reach_the_shard(sharded):
+    sharded.add_medical_record("Patient 1", MedicalRecord("Hypertension", "Lifestyle changes"))
+    sharded.add_prescription("Patient 1", Prescription("Avomit"))
+    sharded.update_medical_record("Patient 1", 0, "Migraine", "Pain medications")
+    patient = sharded.get_patient("Patient 1")
+    assert [record.diagnosis for record in patient.medical_records] == ["Migraine"]
+    assert [prescription.medication for prescription in patient.prescriptions] == ["Avomit"]
+
+
+def test_department_doctors_are_replicated(sharded):
+    sharded.add_department(Department("Cardiology"))
+    sharded.add_department_doctor("Cardiology", Doctor("Dr. New", 35, "Cardiology"))
+    for departments in shard_contents(sharded, 'departments'):
+        assert [doctor['name'] for doctor in departments[-1]['doctors']] == ["Dr. New"]
+
+
+def test_sharded_queries_merge_results(sharded):
+    query = sharded.query('patients').where('age', '>=', 60).order_by('age', descending=True).limit(3)
+    assert [patient.age for patient in query.all()] == [75, 70, 65]
+    assert sharded.query('patients').join('appointments').count() == 4
+    assert [doctor.name for doctor in sharded.query('doctors').join('appointments').all()] == ["Dr. Joshua Lopez"]
+
+
+def test_pagination_spans_shards(sharded):
+    names = []
+    page = sharded.get_patients_page(page_size=5)
+    while True:
+        names.extend(patient['name'] for patient in page['items'])
+        if page['next_cursor'] is None:
+            break
+        page = sharded.get_patients_page(page['next_cursor'], page_size=5)
+    assert sorted(names) == sorted(NAMES)
+    assert len(names) == 12
+
+
+def test_module_level_predicates_are_sent_to_shards(sharded):
+    assert len(list(sharded.iter_patients(is_senior))) == 4
+
+
+def test_unpicklable_predicates_are_rejected(sharded, capsys):
+    assert list(sharded.iter_patients(lambda patient: patient.age > 21)) == []
+    assert sharded.get_patients_page(page_size=2, predicate=lambda patient: patient.age > 21) is None
+    assert capsys.readouterr().out.count("lambda") == 2
+
+
+@pytest.mark.parametrize('storage', [JsonDataStorage(), XmlDataStorage()], ids=['json', 'xml'])
+def test_storages_accept_the_facade(sharded, storage, tmp_path):
+    filename = str(tmp_path / f"clinic{storage.EXTENSION}")
+    storage.save(sharded, filename)
+    assert sorted(patient.name for patient in storage.load(filename).patients) == sorted(NAMES)
+    with pytest.raises(CustomError):
+        storage.save_in_background(sharded, filename)
+
+
+def test_shard_files_follow_storage_extension(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with ShardedClinic(2, XmlDataStorage()) as sharded:
+        assert sharded.save() is True
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["clinic_shard_0.xml", "clinic_shard_1.xml"]
+    with pytest.raises(CustomError):
+        ShardedClinic(2, DataStorage())